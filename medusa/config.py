@@ -42,5 +42,9 @@ FILL_BASE = 0.02              # normal refill rate if vibe is decent
 VIBE_FILL_BOOST = 0.06        # additional refill at high vibe
 VIBE_CHURN_PENALTY = 0.08     # additional churn at low vibe
 
+# Sessions (in-memory LRU)
+SESSION_MAX = 1000                 # most sessions kept before evicting the oldest
+SESSION_TTL_SECONDS = 6 * 60 * 60  # drop sessions idle for longer than this
+
 # UI
 VIBE_BAR_WIDTH = 28
@@ -2,7 +2,8 @@
 from __future__ import annotations
 
 import random
-from typing import List, Tuple
+from statistics import NormalDist
+from typing import Dict, List, Sequence, Tuple
 
 from medusa.config import (
     BPM_MIN,
@@ -12,7 +13,19 @@ from medusa.config import (
     DIFFERENT_CARDS,
 )
 from medusa.models import SongCard
-from medusa.genre import GENRES, genre_index, genre_distance, get_genre_def
+from medusa.genre import (
+    GENRES,
+    FAR_GENRE_MIN_DIST,
+    FAR_GENRES,
+    GENRE_NEIGHBORS,
+    genre_bpm,
+    genre_distance,
+    get_genre_def,
+)
+
+
+_STD_NORMAL = NormalDist()
+_P_EPS = 1e-12
 
 
 def clamp_int(x: int, lo: int, hi: int) -> int:
@@ -27,18 +40,23 @@ def sample_trunc_normal_int(
     hi: int,
 ) -> int:
     """
-    Sample an int from a truncated normal distribution using rejection sampling.
-    For our small stds this is fast in practice.
+    Sample an int from a truncated normal distribution by inverting the CDF:
+    one uniform draw mapped into [Phi(a), Phi(b)], no rejection loop.
     """
     if std <= 0:
         return clamp_int(int(round(mean)), lo, hi)
 
-    for _ in range(30):
-        x = rng.gauss(mean, std)
-        if lo <= x <= hi:
-            return int(round(x))
-    # Fallback if rejection fails
-    return clamp_int(int(round(mean)), lo, hi)
+    cdf_lo = _STD_NORMAL.cdf((lo - mean) / std)
+    cdf_hi = _STD_NORMAL.cdf((hi - mean) / std)
+    width = cdf_hi - cdf_lo
+    if width <= 0.0:
+        # [lo, hi] is so far into a tail the CDF can't resolve it
+        return clamp_int(int(round(mean)), lo, hi)
+
+    p = cdf_lo + rng.random() * width
+    p = min(max(p, _P_EPS), 1.0 - _P_EPS)  # inv_cdf needs 0 < p < 1
+    x = mean + std * _STD_NORMAL.inv_cdf(p)
+    return clamp_int(int(round(x)), lo, hi)
 
 
 def random_genre(rng: random.Random) -> str:
@@ -47,13 +65,18 @@ def random_genre(rng: random.Random) -> str:
 
 def _neighbor_genres(genre: str) -> Tuple[str, str]:
     """Return the two adjacent genres on the ring."""
-    i = genre_index(genre)
-    n = len(GENRES)
-    return (GENRES[(i - 1) % n], GENRES[(i + 1) % n])
+    try:
+        return GENRE_NEIGHBORS[genre]
+    except KeyError as e:
+        raise ValueError(f"Unknown genre: {genre}") from e
 
 
-def _far_genres(active_genre: str, min_dist: int = 3) -> List[str]:
+def _far_genres(active_genre: str, min_dist: int = FAR_GENRE_MIN_DIST) -> Sequence[str]:
     """Genres at least `min_dist` away on the ring."""
+    if min_dist == FAR_GENRE_MIN_DIST:
+        far = FAR_GENRES.get(active_genre)
+        if far is not None:
+            return far
     return [g for g in GENRES if genre_distance(active_genre, g) >= min_dist]
 
 
@@ -68,12 +91,68 @@ def _genre_bpm_bounds(genre: str) -> tuple[int, int]:
     return lo, hi
 
 
+def _genre_bpm_params(genre: str) -> Tuple[float, float, int, int]:
+    return (*genre_bpm(genre), *_genre_bpm_bounds(genre))
+
+
+# (mean, std, lo, hi) per genre; never changes after import, so dealing
+# skips GenreDef lookups and bounds arithmetic.
+_BPM_PARAMS: Dict[str, Tuple[float, float, int, int]] = {
+    g: _genre_bpm_params(g) for g in GENRES}
+
+
+def _bpm_params(genre: str) -> Tuple[float, float, int, int]:
+    return _BPM_PARAMS.get(genre) or _genre_bpm_params(genre)
+
+
+def _similar_bpm(rng: random.Random, genre: str, active_bpm: int) -> int:
+    g_mean, g_std, lo, hi = _bpm_params(genre)
+    # For "similar", blend current bpm with genre mean (leans toward current song)
+    mean = 0.65 * active_bpm + 0.35 * g_mean
+    std = max(3.0, g_std * 0.70)
+    return sample_trunc_normal_int(rng, mean, std, lo, hi)
+
+
+def _different_bpm(rng: random.Random, genre: str, active_bpm: int) -> int:
+    g_mean, g_std, lo, hi = _bpm_params(genre)
+    # For "different", lean harder toward genre mean
+    mean = 0.25 * active_bpm + 0.75 * g_mean
+    std = max(4.0, g_std)
+    bpm = sample_trunc_normal_int(rng, mean, std, lo, hi)
+
+    # Occasional wildcard BPM to create true "risk cards"
+    if rng.random() < 0.12:
+        bpm = sample_trunc_normal_int(rng, g_mean, g_std * 1.25, lo, hi)
+    return bpm
+
+
+def _pick_similar_genre(
+    rng: random.Random, genre: str, neighbors: Sequence[str]
+) -> str:
+    """Same genre most of the time, otherwise adjacent on the ring."""
+    return genre if rng.random() < 0.75 else rng.choice(neighbors)
+
+
+def _pick_different_genre(rng: random.Random, candidates: Sequence[str]) -> str:
+    """A genre at least a few steps away (POC); any genre if none qualify."""
+    return rng.choice(candidates) if candidates else random_genre(rng)
+
+
+def _similar_genres(rng: random.Random, genre: str, k: int) -> List[str]:
+    neighbors = _neighbor_genres(genre)
+    return [_pick_similar_genre(rng, genre, neighbors) for _ in range(k)]
+
+
+def _different_genres(rng: random.Random, genre: str, k: int) -> List[str]:
+    candidates = _far_genres(genre)
+    return [_pick_different_genre(rng, candidates) for _ in range(k)]
+
+
 def gen_base_song(rng: random.Random) -> SongCard:
     """A random song whose BPM is shaped by the genre distribution."""
     genre = random_genre(rng)
-    gd = get_genre_def(genre)
-    lo, hi = _genre_bpm_bounds(genre)
-    bpm = sample_trunc_normal_int(rng, gd.bpm.mean, gd.bpm.std, lo, hi)
+    g_mean, g_std, lo, hi = _bpm_params(genre)
+    bpm = sample_trunc_normal_int(rng, g_mean, g_std, lo, hi)
     return SongCard(bpm=bpm, genre=genre)
 
 
@@ -83,21 +162,9 @@ def gen_similar_song(rng: random.Random, active: SongCard) -> SongCard:
       - genre: same most of the time, otherwise adjacent on the ring
       - bpm: sampled from the *target genre* distribution, nudged toward active bpm
     """
-    if rng.random() < 0.75:
-        genre = active.genre
-    else:
-        left, right = _neighbor_genres(active.genre)
-        genre = rng.choice([left, right])
-
-    gd = get_genre_def(genre)
-    lo, hi = _genre_bpm_bounds(genre)
-
-    # For "similar", blend current bpm with genre mean (leans toward current song)
-    mean = 0.65 * active.bpm + 0.35 * gd.bpm.mean
-    std = max(3.0, gd.bpm.std * 0.70)
-
-    bpm = sample_trunc_normal_int(rng, mean, std, lo, hi)
-    return SongCard(bpm=bpm, genre=genre)
+    genre = _pick_similar_genre(
+        rng, active.genre, _neighbor_genres(active.genre))
+    return SongCard(bpm=_similar_bpm(rng, genre, active.bpm), genre=genre)
 
 
 def gen_different_song(rng: random.Random, active: SongCard) -> SongCard:
@@ -106,24 +173,8 @@ def gen_different_song(rng: random.Random, active: SongCard) -> SongCard:
       - genre: at least a few steps away (POC)
       - bpm: sampled from target genre distribution, leaning toward genre mean
     """
-    candidates = _far_genres(active.genre, min_dist=3)
-    genre = rng.choice(candidates) if candidates else random_genre(rng)
-
-    gd = get_genre_def(genre)
-    lo, hi = _genre_bpm_bounds(genre)
-
-    # For "different", lean harder toward genre mean
-    mean = 0.25 * active.bpm + 0.75 * gd.bpm.mean
-    std = max(4.0, gd.bpm.std)
-
-    bpm = sample_trunc_normal_int(rng, mean, std, lo, hi)
-
-    # Occasional wildcard BPM to create true "risk cards"
-    if rng.random() < 0.12:
-        bpm = sample_trunc_normal_int(
-            rng, gd.bpm.mean, gd.bpm.std * 1.25, lo, hi)
-
-    return SongCard(bpm=bpm, genre=genre)
+    genre = _pick_different_genre(rng, _far_genres(active.genre))
+    return SongCard(bpm=_different_bpm(rng, genre, active.bpm), genre=genre)
 
 
 def deal_hand(rng: random.Random, active: SongCard) -> List[SongCard]:
@@ -132,16 +183,21 @@ def deal_hand(rng: random.Random, active: SongCard) -> List[SongCard]:
       - SIMILAR_CARDS similar to the active song
       - DIFFERENT_CARDS different from the active song
     Then shuffle.
+
+    Genres for the whole hand are picked in one batch (neighbour / far-genre
+    tables are looked up once), then BPMs are sampled and cards built at the end.
     """
     if SIMILAR_CARDS + DIFFERENT_CARDS != HAND_SIZE:
         raise ValueError(
             "SIMILAR_CARDS + DIFFERENT_CARDS must equal HAND_SIZE")
 
-    hand: List[SongCard] = []
-    for _ in range(SIMILAR_CARDS):
-        hand.append(gen_similar_song(rng, active))
-    for _ in range(DIFFERENT_CARDS):
-        hand.append(gen_different_song(rng, active))
+    similar = _similar_genres(rng, active.genre, SIMILAR_CARDS)
+    different = _different_genres(rng, active.genre, DIFFERENT_CARDS)
+
+    bpm = active.bpm
+    hand = [SongCard(bpm=_similar_bpm(rng, g, bpm), genre=g) for g in similar]
+    hand += [SongCard(bpm=_different_bpm(rng, g, bpm), genre=g)
+             for g in different]
 
     rng.shuffle(hand)
     return hand
@@ -9,7 +9,7 @@ from typing import Dict, List, Optional, Tuple
 from medusa.config import BPM_MIN, BPM_MAX
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Dist:
     mean: float
     std: float
@@ -17,7 +17,7 @@ class Dist:
     max: Optional[float] = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class GenreDef:
     name: str
     bpm: Dist
@@ -94,25 +94,58 @@ GENRES: List[str] = sorted(GENRE_DEFS.keys()) if GENRE_DEFS else [
 ]
 
 
-# --- Ring distance (keep for now; later swap for matrix/graph) ---
+# GENRES is static after import, so index lookups come from a prebuilt table.
+_GENRE_INDEX: Dict[str, int] = {g: i for i, g in enumerate(GENRES)}
+
+
+# --- Ring distance (precomputed genre x genre tables) ---
+def _ring_distance(i: int, j: int, n: int) -> int:
+    raw = abs(i - j)
+    return min(raw, n - raw)
+
+
+_GENRE_DIST: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(_ring_distance(i, j, len(GENRES)) for j in range(len(GENRES)))
+    for i in range(len(GENRES))
+)
+
+_GENRE_DIST_NORM: Tuple[Tuple[float, ...], ...] = tuple(
+    tuple(d / max(1, len(GENRES) // 2) for d in row) for row in _GENRE_DIST
+)
+
+
 def genre_index(genre: str) -> int:
     try:
-        return GENRES.index(genre)
-    except ValueError as e:
+        return _GENRE_INDEX[genre]
+    except KeyError as e:
         raise ValueError(f"Unknown genre: {genre}") from e
 
 
 def genre_distance(a: str, b: str) -> int:
-    ia = genre_index(a)
-    ib = genre_index(b)
-    n = len(GENRES)
-    raw = abs(ia - ib)
-    return min(raw, n - raw)
+    return _GENRE_DIST[genre_index(a)][genre_index(b)]
 
 
 def genre_distance_norm(a: str, b: str) -> float:
-    max_dist = max(1, len(GENRES) // 2)
-    return genre_distance(a, b) / max_dist
+    return _GENRE_DIST_NORM[genre_index(a)][genre_index(b)]
+
+
+# Ring neighbours / far genres, precomputed once (used by generation).
+FAR_GENRE_MIN_DIST = 3
+
+GENRE_NEIGHBORS: Dict[str, Tuple[str, str]] = {
+    g: (GENRES[(i - 1) % len(GENRES)], GENRES[(i + 1) % len(GENRES)])
+    for i, g in enumerate(GENRES)
+}
+
+# _FAR_IDX[i] = GENRES indices at least FAR_GENRE_MIN_DIST from genre i
+_FAR_IDX: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(j for j, d in enumerate(row) if d >= FAR_GENRE_MIN_DIST)
+    for row in _GENRE_DIST
+)
+
+FAR_GENRES: Dict[str, Tuple[str, ...]] = {
+    g: tuple(GENRES[j] for j in _FAR_IDX[i]) for i, g in enumerate(GENRES)
+}
 
 
 def bpm_distance_norm(bpm_a: int, bpm_b: int) -> float:
@@ -129,11 +162,75 @@ def song_similarity(
     genre_weight: float = 0.65,
     bpm_weight: float = 0.35,
 ) -> float:
-    gd = genre_distance_norm(genre_a, genre_b)
+    return song_similarity_idx(
+        genre_index(genre_a), bpm_a, genre_index(genre_b), bpm_b,
+        genre_weight=genre_weight, bpm_weight=bpm_weight,
+    )
+
+
+def song_similarity_idx(
+    ia: int,
+    bpm_a: int,
+    ib: int,
+    bpm_b: int,
+    *,
+    genre_weight: float = 0.65,
+    bpm_weight: float = 0.35,
+) -> float:
+    """song_similarity for genres already resolved to their GENRES index."""
+    gd = _GENRE_DIST_NORM[ia][ib]
     bd = bpm_distance_norm(bpm_a, bpm_b)
     dist = (genre_weight * gd) + (bpm_weight * bd)
     return 1.0 - min(dist, 1.0)
 
 
+# Defaults are built once per unknown name instead of on every lookup.
+_DEFAULT_DEFS: Dict[str, GenreDef] = {}
+
+
 def get_genre_def(name: str) -> GenreDef:
-    return GENRE_DEFS.get(name) or _default_genre(name)
+    gd = GENRE_DEFS.get(name)
+    if gd is not None:
+        return gd
+    gd = _DEFAULT_DEFS.get(name)
+    if gd is None:
+        gd = _DEFAULT_DEFS[name] = _default_genre(name)
+    return gd
+
+
+# --- Genre params frozen into parallel tables indexed by genre_index ---
+# (appeal triples are ordered male, queer, normie)
+_BPM_MEAN: Tuple[float, ...] = tuple(get_genre_def(g).bpm.mean for g in GENRES)
+_BPM_STD: Tuple[float, ...] = tuple(get_genre_def(g).bpm.std for g in GENRES)
+
+_APPEAL_MEAN: Tuple[Tuple[float, float, float], ...] = tuple(
+    (gd.appeal_male.mean, gd.appeal_queer.mean, gd.appeal_normie.mean)
+    for gd in map(get_genre_def, GENRES)
+)
+_APPEAL_STD: Tuple[Tuple[float, float, float], ...] = tuple(
+    (gd.appeal_male.std, gd.appeal_queer.std, gd.appeal_normie.std)
+    for gd in map(get_genre_def, GENRES)
+)
+
+
+def genre_bpm(genre: str) -> Tuple[float, float]:
+    """(mean, std) of the genre's BPM distribution."""
+    i = _GENRE_INDEX.get(genre)
+    if i is None:
+        gd = get_genre_def(genre)
+        return gd.bpm.mean, gd.bpm.std
+    return _BPM_MEAN[i], _BPM_STD[i]
+
+
+def genre_appeal(
+    genre: str,
+) -> Tuple[Tuple[float, float, float], Tuple[float, float, float]]:
+    """((male, queer, normie) means, (male, queer, normie) stds) of appeal."""
+    i = _GENRE_INDEX.get(genre)
+    if i is None:
+        gd = get_genre_def(genre)
+        return (
+            (gd.appeal_male.mean, gd.appeal_queer.mean, gd.appeal_normie.mean),
+            (gd.appeal_male.std, gd.appeal_queer.std, gd.appeal_normie.std),
+        )
+    return _APPEAL_MEAN[i], _APPEAL_STD[i]
@@ -0,0 +1,16 @@
+# medusa/mathutil.py
+from __future__ import annotations
+
+from medusa.config import VIBE_MIN, VIBE_MAX
+
+_VIBE_SPAN = VIBE_MAX - VIBE_MIN
+
+
+def clamp(x: float, lo: float, hi: float) -> float:
+    return lo if x < lo else hi if x > hi else x
+
+
+def vibe_to_01(vibe: float) -> float:
+    if _VIBE_SPAN <= 0:
+        return 0.5
+    return clamp((vibe - VIBE_MIN) / _VIBE_SPAN, 0.0, 1.0)
@@ -1,18 +1,58 @@
 # djrogue/models.py
 from __future__ import annotations
 
+import random
+from array import array
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
-
-
-@dataclass(frozen=True)
+from typing import Dict, List, Mapping, Optional
+
+# Fixed layout of TurnResult.diagnostics_vec (scoring keys, then club sim keys).
+DIAG_KEYS = (
+    "vibe01",
+    "similarity",
+    "risk",
+    "appeal",
+    "variety",
+    "safe_penalty",
+    "rep_mult",
+    "rep_hits",
+    "trainwreck_threshold",
+    "trainwreck_chance",
+    "did_trainwreck",
+    "vibe_mult",
+    "appeal_mult",
+    "variety_mult",
+    "capacity_before",
+    "capacity_after",
+    "capacity_delta",
+    "male_before",
+    "male_after",
+    "male_delta",
+    "queer_before",
+    "queer_after",
+    "queer_delta",
+    "normie_before",
+    "normie_after",
+    "normie_delta",
+    "churn",
+    "fill",
+    "turbulence",
+)
+
+
+def pack_diagnostics(diagnostics: Mapping[str, float]) -> array:
+    """Pack a diagnostics mapping into a float32 vector ordered by DIAG_KEYS."""
+    return array("f", [diagnostics[k] for k in DIAG_KEYS])
+
+
+@dataclass(frozen=True, slots=True)
 class SongCard:
     """A playable (or active) song."""
     bpm: int
     genre: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ClubState:
     """
     All ratios are 0..1 and represent the LEFT label share:
@@ -28,7 +68,7 @@ class ClubState:
     normie: float
 
 
-@dataclass
+@dataclass(slots=True)
 class TurnResult:
     """What happened after playing one card."""
     turn_index: int
@@ -47,11 +87,16 @@ class TurnResult:
     capacity_after: float
 
     # Useful for later debugging/balancing and for a future "history" view.
-    diagnostics: Dict[str, float] = field(default_factory=dict)
+    # Stored as a float32 vector laid out by DIAG_KEYS (see pack_diagnostics).
+    diagnostics_vec: array = field(default_factory=lambda: array("f"))
     reaction: str = ""
 
+    @property
+    def diagnostics(self) -> Dict[str, float]:
+        return dict(zip(DIAG_KEYS, self.diagnostics_vec))
+
 
-@dataclass
+@dataclass(slots=True)
 class GameState:
     """
     The current game state. Keep this as a 'data bag' — logic lives elsewhere.
@@ -71,5 +116,15 @@ class GameState:
     # Full turn-by-turn history
     history: List[TurnResult] = field(default_factory=list)
 
+    # Parallel per-turn buffers of the chosen cards (GENRES index, bpm), kept
+    # alongside `history` so scoring windows are slices instead of attribute chases.
+    hist_genre_idx: array = field(default_factory=lambda: array("h"))
+    hist_bpm: array = field(default_factory=lambda: array("h"))
+
     # Optional: last message for UI flavor
     last_reaction: str = ""
+
+    # Per-session RNG stream, seeded once in new_game and advanced in place
+    # every turn (instead of re-seeding a fresh Random per request).
+    rng: random.Random = field(
+        default_factory=random.Random, repr=False, compare=False)
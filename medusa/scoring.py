@@ -2,117 +2,126 @@
 from __future__ import annotations
 
 import random
-from typing import Dict, List, Tuple
+from typing import Dict, Optional, Sequence, Tuple
 
 from medusa.config import (
     BASE_POINTS,
     VARIETY_WINDOW,
     SAFE_SIMILARITY_CAP,
-    VIBE_MIN,
-    VIBE_MAX,
 )
-from medusa.models import ClubState, SongCard, TurnResult
-from medusa.genre import song_similarity, get_genre_def
-
-
-def clamp(x: float, lo: float, hi: float) -> float:
-    return lo if x < lo else hi if x > hi else x
-
-
-def vibe_to_01(vibe: float) -> float:
-    span = VIBE_MAX - VIBE_MIN
-    if span <= 0:
-        return 0.5
-    return clamp((vibe - VIBE_MIN) / span, 0.0, 1.0)
+from medusa.mathutil import clamp, vibe_to_01
+from medusa.models import ClubState, SongCard
+from medusa.genre import (
+    genre_appeal,
+    genre_index,
+    song_similarity,
+    song_similarity_idx,
+)
 
 
 def sample_appeal_for_room(rng: random.Random, club: ClubState, genre: str) -> float:
-    gd = get_genre_def(genre)
-
-    a_male = clamp(rng.gauss(gd.appeal_male.mean,
-                   gd.appeal_male.std), 0.0, 1.0)
-    a_queer = clamp(rng.gauss(gd.appeal_queer.mean,
-                    gd.appeal_queer.std), 0.0, 1.0)
-    a_normie = clamp(rng.gauss(gd.appeal_normie.mean,
-                     gd.appeal_normie.std), 0.0, 1.0)
+    (m_male, m_queer, m_normie), (s_male, s_queer, s_normie) = \
+        genre_appeal(genre)
+
+    a_male = clamp(rng.gauss(m_male, s_male), 0.0, 1.0)
+    a_queer = clamp(rng.gauss(m_queer, s_queer), 0.0, 1.0)
+    a_normie = clamp(rng.gauss(m_normie, s_normie), 0.0, 1.0)
+
+    # Per channel, c*a + (1-c)*(1-a) == 1 - (c + a) + 2*c*a; summed over the
+    # three channels that folds to one expression.
+    c_male, c_queer, c_normie = club.male, club.queer, club.normie
+    parts = (
+        3.0
+        - (c_male + c_queer + c_normie)
+        - (a_male + a_queer + a_normie)
+        + 2.0 * (c_male * a_male + c_queer * a_queer + c_normie * a_normie)
+    )
 
-    male_part = club.male * a_male + (1.0 - club.male) * (1.0 - a_male)
-    queer_part = club.queer * a_queer + (1.0 - club.queer) * (1.0 - a_queer)
-    normie_part = club.normie * a_normie + \
-        (1.0 - club.normie) * (1.0 - a_normie)
+    # blended = parts / 3; keep it soft and non-solvable
+    return 0.25 + 0.25 * parts  # ~[0.25..1.0]
 
-    blended = (male_part + queer_part + normie_part) / 3.0
 
-    # keep it soft and non-solvable
-    return 0.25 + 0.75 * blended  # ~[0.25..1.0]
+def variety_score(history_genre_idx: Sequence[int], chosen: SongCard) -> float:
+    """
+    Share of distinct genres among the recent window plus the chosen card.
+    history_genre_idx is GameState.hist_genre_idx (GENRES index per turn).
+    """
+    if not history_genre_idx:
+        return 1.0
+    recent = history_genre_idx[-VARIETY_WINDOW:] \
+        if VARIETY_WINDOW > 0 else history_genre_idx
+    unique = len(set(recent) | {genre_index(chosen.genre)})
+    return unique / (len(recent) + 1)
 
 
-def variety_score(history: List[TurnResult], chosen: SongCard) -> float:
-    recent = history[-VARIETY_WINDOW:] if VARIETY_WINDOW > 0 else history
-    genres = [tr.chosen_card.genre for tr in recent] + [chosen.genre]
-    if not genres:
-        return 0.5
-    unique = len(set(genres))
-    return unique / len(genres)
+_REP_HIT_MULT = 0.72
+_REP_SIM_MULT = 0.88
 
 
-def repetition_penalty(history: List[TurnResult], chosen: SongCard) -> Dict[str, float]:
+def repetition_penalty(
+    history_genre_idx: Sequence[int],
+    history_bpm: Sequence[int],
+    chosen: SongCard,
+) -> Dict[str, float]:
     """
     HARD MODE: punish same-genre & close-BPM repetition heavily.
     Goal: three similar rap tracks in a row should crater points (e.g. ~50 from 100).
 
+    history_genre_idx / history_bpm are the parallel per-turn buffers on GameState.
+
     Returns dict with:
       rep_mult in (0..1]
       rep_hits: count of "samey" matches in recent window
     """
-    window = history[-3:]  # last 3 plays is enough to feel it
-    hits = 0
-    mult = 1.0
-
-    for tr in reversed(window):
-        prev = tr.chosen_card
-        same_genre = (prev.genre == chosen.genre)
-        bpm_close = abs(prev.bpm - chosen.bpm) <= 8
-
-        # "samey" = same genre + close bpm
-        if same_genre and bpm_close:
-            hits += 1
-            mult *= 0.72  # stacks hard: 1 hit ~0.72, 2 hits ~0.52, 3 hits ~0.37
+    if not history_genre_idx:
+        return {"rep_mult": 1.0, "rep_hits": 0.0}
+
+    # last 3 plays is enough to feel it
+    window = list(zip(history_genre_idx[-3:], history_bpm[-3:]))
+    chosen_idx = genre_index(chosen.genre)
+    chosen_bpm = chosen.bpm
+
+    # "samey" = same genre + close bpm
+    hits = sum(
+        prev_idx == chosen_idx and abs(prev_bpm - chosen_bpm) <= 8
+        for prev_idx, prev_bpm in window
+    )
+    # also punish ultra-high similarity regardless of genre name
+    high_sim = sum(
+        song_similarity_idx(prev_idx, prev_bpm, chosen_idx, chosen_bpm) >= 0.88
+        for prev_idx, prev_bpm in window
+    )
 
-        # also punish ultra-high similarity regardless of genre name
-        sim = song_similarity(prev.genre, prev.bpm, chosen.genre, chosen.bpm)
-        if sim >= 0.88:
-            mult *= 0.88
+    # stacks hard: 1 hit ~0.72, 2 hits ~0.52, 3 hits ~0.37
+    mult = (_REP_HIT_MULT ** hits) * (_REP_SIM_MULT ** high_sim)
 
     # floor so it’s not literally zero
     mult = clamp(mult, 0.30, 1.0)
     return {"rep_mult": mult, "rep_hits": float(hits)}
 
 
-def score_choice(
-    *,
-    rng: random.Random,
-    turn_index: int,
-    score_total: int,
-    vibe: float,  # -100..100
-    club: ClubState,
-    active_song: SongCard,
-    chosen: SongCard,
-    history: List[TurnResult],
-) -> Tuple[int, float, str, Dict[str, float]]:
-    vibe01 = vibe_to_01(vibe)
+TRAINWRECK_THRESHOLD = 0.45
 
-    similarity = song_similarity(
-        active_song.genre, active_song.bpm,
-        chosen.genre, chosen.bpm,
-    )
-    risk = 1.0 - similarity
 
-    appeal = sample_appeal_for_room(rng, club, chosen.genre)
-    variety = variety_score(history, chosen)
+def _score_core(
+    vibe01: float,
+    similarity: float,
+    appeal: float,
+    variety: float,
+    rep_mult: float,
+    u_trainwreck: float,
+    u_surprise: float,
+) -> Tuple[float, float, float, float, float, float, float, bool, bool]:
+    """
+    Pure numeric core of score_choice: plain floats in, plain floats out.
+    Randomness is pre-drawn by the caller (u_* are uniforms in [0, 1)).
+    Only scalar arithmetic and builtin min/max, no Python helpers, so it stays
+    Numba nopython-compatible.
 
-    rep = repetition_penalty(history, chosen)
-    rep_mult = rep["rep_mult"]
+    Returns (raw_points, vibe_delta, safe_penalty, variety_mult, vibe_mult,
+             appeal_mult, trainwreck_chance, did_trainwreck, did_surprise).
+    """
+    risk = 1.0 - similarity
 
     # SAFE CAP IS STRONGER in hard mode
     safe_penalty = 1.0
@@ -135,14 +144,14 @@ def score_choice(
     # Stronger trainwreck:
     # - higher threshold
     # - higher chance cap
-    trainwreck_threshold = 0.45
     trainwreck_chance = 0.0
-    if similarity < trainwreck_threshold:
+    if similarity < TRAINWRECK_THRESHOLD:
         # risk drives it up; low vibe drives it up
-        trainwreck_chance = clamp(
-            (risk * 1.05) + ((1.0 - vibe01) * 0.35), 0.0, 0.88)
+        trainwreck_chance = min(
+            max((risk * 1.05) + ((1.0 - vibe01) * 0.35), 0.0), 0.88)
 
-    did_trainwreck = (rng.random() < trainwreck_chance)
+    did_trainwreck = u_trainwreck < trainwreck_chance
+    did_surprise = False
 
     # Vibe delta in vibe points
     vibe_delta = 0.0
@@ -151,53 +160,104 @@ def score_choice(
     vibe_delta -= (risk) * 12.0
     vibe_delta -= (1.0 - rep_mult) * 18.0  # repeating drains vibe
 
-    reaction = ""
-
     if did_trainwreck:
         # Trainwreck should feel brutal
         raw_points *= 0.12
         vibe_delta -= (26.0 + 28.0 * risk)
-        reaction = "TRAINWRECK! You lose the room — people bail fast."
     else:
         # “pop-off” chance exists but is rarer
-        surprise_chance = clamp(
-            (appeal * 0.18) + (variety * 0.14) - (similarity * 0.10), 0.0, 0.14)
-        if rng.random() < surprise_chance and similarity < 0.75:
+        surprise_chance = min(max(
+            (appeal * 0.18) + (variety * 0.14) - (similarity * 0.10), 0.0), 0.14)
+        if u_surprise < surprise_chance and similarity < 0.75:
             raw_points *= 1.12
             vibe_delta += 6.0
-            reaction = "Switch-up lands — hands go up."
-
-    if not reaction:
-        if rep_mult < 0.65:
-            reaction = "Same lane too long — the room gets restless."
-        elif appeal > 0.85 and similarity > 0.55:
-            reaction = "Locked in. The room nods in unison."
-        elif appeal > 0.85 and similarity <= 0.55:
-            reaction = "Bold choice, but it hits. The floor heats up."
-        elif appeal <= 0.60 and similarity > 0.70:
-            reaction = "Safe, but the room looks bored."
-        elif appeal <= 0.60 and similarity <= 0.55:
-            reaction = "Hmm… people start drifting."
-        else:
-            reaction = "Solid. The vibe holds."
+            did_surprise = True
+
+    return (
+        raw_points, vibe_delta, safe_penalty, variety_mult, vibe_mult,
+        appeal_mult, trainwreck_chance, did_trainwreck, did_surprise,
+    )
+
+
+def score_choice(
+    *,
+    rng: random.Random,
+    turn_index: int,
+    score_total: int,
+    vibe: float,  # -100..100
+    club: ClubState,
+    active_song: SongCard,
+    chosen: SongCard,
+    history_genre_idx: Sequence[int],
+    history_bpm: Sequence[int],
+    diagnostics: Optional[Dict[str, float]] = None,
+) -> Tuple[int, float, str, bool, Dict[str, float]]:
+    """
+    Score playing `chosen` on top of `active_song`.
+
+    Returns (points_gained, vibe_delta, reaction, did_trainwreck, diagnostics).
+
+    Diagnostics are written into `diagnostics` when given (so a caller can
+    share one dict across scoring + club sim), otherwise into a new dict.
+    """
+    vibe01 = vibe_to_01(vibe)
+
+    similarity = song_similarity(
+        active_song.genre, active_song.bpm,
+        chosen.genre, chosen.bpm,
+    )
+
+    appeal = sample_appeal_for_room(rng, club, chosen.genre)
+    variety = variety_score(history_genre_idx, chosen)
+
+    rep = repetition_penalty(history_genre_idx, history_bpm, chosen)
+    rep_mult = rep["rep_mult"]
+
+    # Both uniforms (trainwreck, surprise) are drawn every turn so the core
+    # stays pure; the surprise draw used to happen only without a trainwreck,
+    # so seeded runs follow a different RNG stream than before the split.
+    (
+        raw_points, vibe_delta, safe_penalty, variety_mult, vibe_mult,
+        appeal_mult, trainwreck_chance, did_trainwreck, did_surprise,
+    ) = _score_core(
+        vibe01, similarity, appeal, variety, rep_mult,
+        rng.random(), rng.random(),
+    )
+
+    if did_trainwreck:
+        reaction = "TRAINWRECK! You lose the room — people bail fast."
+    elif did_surprise:
+        reaction = "Switch-up lands — hands go up."
+    elif rep_mult < 0.65:
+        reaction = "Same lane too long — the room gets restless."
+    elif appeal > 0.85 and similarity > 0.55:
+        reaction = "Locked in. The room nods in unison."
+    elif appeal > 0.85 and similarity <= 0.55:
+        reaction = "Bold choice, but it hits. The floor heats up."
+    elif appeal <= 0.60 and similarity > 0.70:
+        reaction = "Safe, but the room looks bored."
+    elif appeal <= 0.60 and similarity <= 0.55:
+        reaction = "Hmm… people start drifting."
+    else:
+        reaction = "Solid. The vibe holds."
 
     # Still non-negative for now (you wanted to think about negatives later)
     points_gained = max(0, int(round(raw_points)))
 
-    diagnostics = {
-        "vibe01": vibe01,
-        "similarity": similarity,
-        "risk": risk,
-        "appeal": appeal,
-        "variety": variety,
-        "safe_penalty": safe_penalty,
-        "rep_mult": rep_mult,
-        "rep_hits": rep["rep_hits"],
-        "trainwreck_threshold": trainwreck_threshold,
-        "trainwreck_chance": trainwreck_chance,
-        "did_trainwreck": 1.0 if did_trainwreck else 0.0,
-        "vibe_mult": vibe_mult,
-        "appeal_mult": appeal_mult,
-        "variety_mult": variety_mult,
-    }
-    return points_gained, vibe_delta, reaction, diagnostics
+    if diagnostics is None:
+        diagnostics = {}
+    diagnostics["vibe01"] = vibe01
+    diagnostics["similarity"] = similarity
+    diagnostics["risk"] = 1.0 - similarity
+    diagnostics["appeal"] = appeal
+    diagnostics["variety"] = variety
+    diagnostics["safe_penalty"] = safe_penalty
+    diagnostics["rep_mult"] = rep_mult
+    diagnostics["rep_hits"] = rep["rep_hits"]
+    diagnostics["trainwreck_threshold"] = TRAINWRECK_THRESHOLD
+    diagnostics["trainwreck_chance"] = trainwreck_chance
+    diagnostics["did_trainwreck"] = 1.0 if did_trainwreck else 0.0
+    diagnostics["vibe_mult"] = vibe_mult
+    diagnostics["appeal_mult"] = appeal_mult
+    diagnostics["variety_mult"] = variety_mult
+    return points_gained, vibe_delta, reaction, did_trainwreck, diagnostics
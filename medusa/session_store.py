@@ -0,0 +1,310 @@
+# medusa/session_store.py
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import random
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager, suppress
+from typing import Any, ContextManager, Dict, Iterator, Optional, Tuple, Union
+
+from medusa.config import SESSION_MAX, SESSION_TTL_SECONDS
+from medusa.models import ClubState, GameState, SongCard, TurnResult
+
+
+_SID_LOCK_STRIPES = 64
+_SWEEP_INTERVAL_SECONDS = 60.0
+
+
+class LRUSessions:
+    """
+    In-memory session map bounded by size (LRU eviction) and idle time (TTL).
+    Only the get/set surface the routes need. Safe to share across the
+    threadpool FastAPI runs sync handlers on.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[str, Tuple[GameState, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Striped per-sid locks for callers' read-modify-write (see lock()).
+        self._sid_locks = [threading.Lock() for _ in range(_SID_LOCK_STRIPES)]
+
+    def lock(self, sid: str) -> ContextManager[Any]:
+        """Lock held by a caller across get -> mutate -> set of one sid."""
+        return self._sid_locks[hash(sid) % _SID_LOCK_STRIPES]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def get(self, sid: str) -> Optional[GameState]:
+        with self._lock:
+            entry = self._data.get(sid)
+            if entry is None:
+                return None
+            state, last_access = entry
+            now = time.monotonic()
+            if now - last_access > self.ttl_seconds:
+                self._data.pop(sid, None)
+                return None
+            self._data[sid] = (state, now)
+            self._data.move_to_end(sid)
+            return state
+
+    def __getitem__(self, sid: str) -> GameState:
+        state = self.get(sid)
+        if state is None:
+            raise KeyError(sid)
+        return state
+
+    def __setitem__(self, sid: str, state: GameState) -> None:
+        with self._lock:
+            self._data[sid] = (state, time.monotonic())
+            self._data.move_to_end(sid)
+            self._evict()
+
+    def _evict(self) -> None:
+        # Caller holds self._lock.
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+        # Oldest entries sit at the front, so stop at the first live one.
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._data:
+            _, last_access = next(iter(self._data.values()))
+            if last_access >= cutoff:
+                break
+            self._data.popitem(last=False)
+
+
+class FileSessions:
+    """
+    Sessions stored as one JSON file per sid under `directory`, so several
+    worker processes can share them. Writes are atomic (unique temp file +
+    os.replace); every read parses the file fresh, so a worker always sees the
+    latest turn. Use lock(sid) around read-modify-write.
+
+    Sessions whose file hasn't been written for `ttl_seconds` are treated as
+    gone; writes periodically sweep expired files from the directory.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: float = SESSION_TTL_SECONDS):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self._last_sweep = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def lock(self, sid: str) -> Iterator[None]:
+        """
+        Exclusive flock on `{sid}.lock` held by a caller across
+        get -> mutate -> set, so threads and worker processes serialize.
+        """
+        path = self._path(sid)
+        if path is None or not os.path.exists(path):
+            # Nothing to protect; don't leave lock files for unknown sids.
+            yield
+            return
+        import fcntl  # POSIX-only; keep the in-memory mode importable elsewhere
+
+        with open(self._lock_path(path), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _path(self, sid: str) -> Optional[str]:
+        # sid comes straight from the URL; only accept real uuids as filenames.
+        try:
+            uuid.UUID(sid)
+        except ValueError:
+            return None
+        return os.path.join(self.directory, f"{sid}.json")
+
+    @staticmethod
+    def _lock_path(path: str) -> str:
+        return f"{path[:-len('.json')]}.lock"
+
+    def __len__(self) -> int:
+        return sum(1 for name in os.listdir(self.directory)
+                   if name.endswith(".json"))
+
+    def get(self, sid: str) -> Optional[GameState]:
+        path = self._path(sid)
+        if path is None:
+            return None
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                self._remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        try:
+            return state_from_dict(raw)
+        except (KeyError, TypeError, ValueError):
+            # Written by an older/incompatible format: treat as no session.
+            return None
+
+    def __getitem__(self, sid: str) -> GameState:
+        state = self.get(sid)
+        if state is None:
+            raise KeyError(sid)
+        return state
+
+    def __setitem__(self, sid: str, state: GameState) -> None:
+        path = self._path(sid)
+        if path is None:
+            raise KeyError(sid)
+        # Unique temp file per write, so concurrent writers never share one.
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.directory,
+            prefix=f".{sid}.", suffix=".tmp", delete=False,
+        ) as f:
+            json.dump(state_to_dict(state), f, separators=(",", ":"))
+        try:
+            os.replace(f.name, path)
+        except OSError:
+            os.unlink(f.name)
+            raise
+        self._maybe_sweep()
+
+    def _remove(self, path: str) -> None:
+        """Delete a session file and its lock file, if still there."""
+        for p in (path, self._lock_path(path)):
+            with suppress(FileNotFoundError):
+                os.unlink(p)
+
+    def _maybe_sweep(self) -> None:
+        # At most one directory scan per _SWEEP_INTERVAL_SECONDS per process.
+        now = time.time()
+        if now - self._last_sweep < _SWEEP_INTERVAL_SECONDS:
+            return
+        self._last_sweep = now
+        cutoff = now - self.ttl_seconds
+        # Lock files without a session file come from a lock() that raced a
+        # removal; give in-flight holders a grace period before deleting.
+        orphan_cutoff = now - _SWEEP_INTERVAL_SECONDS
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                name = entry.name
+                if not name.endswith((".json", ".tmp", ".lock")):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                if name.endswith(".json"):
+                    if mtime < cutoff:
+                        self._remove(entry.path)
+                elif name.endswith(".lock"):
+                    session_path = f"{entry.path[:-len('.lock')]}.json"
+                    if mtime < orphan_cutoff and not os.path.exists(session_path):
+                        with suppress(FileNotFoundError):
+                            os.unlink(entry.path)
+                elif mtime < cutoff:
+                    # temp file orphaned by a crashed writer
+                    with suppress(FileNotFoundError):
+                        os.unlink(entry.path)
+
+
+SessionStore = Union[LRUSessions, FileSessions]
+
+
+def make_session_store() -> SessionStore:
+    """FileSessions if MEDUSA_SESSION_DIR is set, otherwise the in-memory LRU."""
+    directory = os.environ.get("MEDUSA_SESSION_DIR")
+    if directory:
+        return FileSessions(directory)
+    return LRUSessions(SESSION_MAX, SESSION_TTL_SECONDS)
+
+
+# --- GameState <-> plain JSON-able dicts ---
+def _card_to_list(card: SongCard) -> list:
+    return [card.bpm, card.genre]
+
+
+def _card_from_list(raw: list) -> SongCard:
+    return SongCard(bpm=int(raw[0]), genre=str(raw[1]))
+
+
+def _turn_to_dict(tr: TurnResult) -> Dict[str, Any]:
+    return {
+        "turn_index": tr.turn_index,
+        "chosen_index": tr.chosen_index,
+        "chosen_card": _card_to_list(tr.chosen_card),
+        "prev_active": _card_to_list(tr.prev_active),
+        "points_gained": tr.points_gained,
+        "score_total": tr.score_total,
+        "vibe_before": tr.vibe_before,
+        "vibe_after": tr.vibe_after,
+        "capacity_before": tr.capacity_before,
+        "capacity_after": tr.capacity_after,
+        "diagnostics_vec": tr.diagnostics_vec.tolist(),
+        "reaction": tr.reaction,
+    }
+
+
+def _turn_from_dict(raw: Dict[str, Any]) -> TurnResult:
+    return TurnResult(
+        turn_index=raw["turn_index"],
+        chosen_index=raw["chosen_index"],
+        chosen_card=_card_from_list(raw["chosen_card"]),
+        prev_active=_card_from_list(raw["prev_active"]),
+        points_gained=raw["points_gained"],
+        score_total=raw["score_total"],
+        vibe_before=raw["vibe_before"],
+        vibe_after=raw["vibe_after"],
+        capacity_before=raw["capacity_before"],
+        capacity_after=raw["capacity_after"],
+        diagnostics_vec=array("f", raw["diagnostics_vec"]),
+        reaction=raw["reaction"],
+    )
+
+
+def state_to_dict(state: GameState) -> Dict[str, Any]:
+    version, internal, gauss_next = state.rng.getstate()
+    club = state.club
+    return {
+        "rng_seed": state.rng_seed,
+        "turn": state.turn,
+        "score": state.score,
+        "vibe": state.vibe,
+        "club": [club.capacity, club.male, club.queer, club.normie],
+        "active_song": _card_to_list(state.active_song),
+        "hand": [_card_to_list(c) for c in state.hand],
+        "history": [_turn_to_dict(tr) for tr in state.history],
+        "hist_genre_idx": state.hist_genre_idx.tolist(),
+        "hist_bpm": state.hist_bpm.tolist(),
+        "last_reaction": state.last_reaction,
+        "rng_state": [version, list(internal), gauss_next],
+    }
+
+
+def state_from_dict(raw: Dict[str, Any]) -> GameState:
+    capacity, male, queer, normie = raw["club"]
+    version, internal, gauss_next = raw["rng_state"]
+    rng = random.Random()
+    rng.setstate((version, tuple(internal), gauss_next))
+    return GameState(
+        rng_seed=raw["rng_seed"],
+        turn=raw["turn"],
+        score=raw["score"],
+        vibe=raw["vibe"],
+        club=ClubState(capacity=capacity, male=male, queer=queer, normie=normie),
+        active_song=_card_from_list(raw["active_song"]),
+        hand=[_card_from_list(c) for c in raw["hand"]],
+        history=[_turn_from_dict(tr) for tr in raw["history"]],
+        hist_genre_idx=array("h", raw["hist_genre_idx"]),
+        hist_bpm=array("h", raw["hist_bpm"]),
+        last_reaction=raw["last_reaction"],
+        rng=rng,
+    )
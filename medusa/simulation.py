@@ -2,45 +2,36 @@
 from __future__ import annotations
 
 import random
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 
 from medusa.config import (
     CHURN_BASE,
     FILL_BASE,
     VIBE_FILL_BOOST,
     VIBE_CHURN_PENALTY,
-    VIBE_MIN,
-    VIBE_MAX,
 )
+from medusa.mathutil import clamp, vibe_to_01
 from medusa.models import ClubState
 
 
-def clamp(x: float, lo: float, hi: float) -> float:
-    return lo if x < lo else hi if x > hi else x
-
-
-def vibe_to_01(vibe: float) -> float:
-    span = VIBE_MAX - VIBE_MIN
-    if span <= 0:
-        return 0.5
-    return clamp((vibe - VIBE_MIN) / span, 0.0, 1.0)
-
-
 def update_club(
     *,
     rng: random.Random,
     club: ClubState,
     vibe_before: float,
     vibe_after: float,
-    diagnostics: Dict[str, float],
+    did_trainwreck: bool,
+    diagnostics: Optional[Dict[str, float]] = None,
 ) -> Tuple[ClubState, Dict[str, float]]:
     """
     Harder simulation:
       - capacity responds more violently to vibe + trainwreck
       - demographic splits drift faster (bigger random walk), especially on low vibe
+
+    Sim diagnostics are written into `diagnostics` when given, otherwise into
+    a new dict.
     """
     cap_before = club.capacity
-    did_trainwreck = diagnostics.get("did_trainwreck", 0.0) >= 0.5
 
     v01 = vibe_to_01(vibe_after)
 
@@ -62,28 +53,26 @@ def update_club(
     # - more turbulence when vibe is low or trainwreck
     turbulence = (1.0 - v01) * 0.22 + (0.18 if did_trainwreck else 0.0)
 
-    def drift(value: float) -> float:
-        # random walk with reflective bounds
-        step = rng.uniform(-0.06, 0.06) * (0.55 + turbulence)
-        return clamp(value + step, 0.02, 0.98)
-
     male_before = club.male
     queer_before = club.queer
     normie_before = club.normie
 
-    male_after = drift(male_before)
-    queer_after = drift(queer_before)
-    normie_after = drift(normie_before)
+    # random walk with reflective bounds, all three splits in one pass
+    uniform = rng.uniform
+    step_scale = 0.55 + turbulence
+    male_after, queer_after, normie_after = [
+        clamp(v + uniform(-0.06, 0.06) * step_scale, 0.02, 0.98)
+        for v in (male_before, queer_before, normie_before)
+    ]
 
     # Extra “room turnover” effect when capacity changes a lot
     cap_delta_abs = abs(cap_after - cap_before)
     if cap_delta_abs > 0.04:
         boost = min(0.12, cap_delta_abs * 1.5)
-        male_after = clamp(male_after + rng.uniform(-boost, boost), 0.02, 0.98)
-        queer_after = clamp(
-            queer_after + rng.uniform(-boost, boost), 0.02, 0.98)
-        normie_after = clamp(
-            normie_after + rng.uniform(-boost, boost), 0.02, 0.98)
+        male_after, queer_after, normie_after = [
+            clamp(v + uniform(-boost, boost), 0.02, 0.98)
+            for v in (male_after, queer_after, normie_after)
+        ]
 
     new_club = ClubState(
         capacity=cap_after,
@@ -92,22 +81,22 @@ def update_club(
         normie=normie_after,
     )
 
-    sim_diag = {
-        "capacity_before": cap_before,
-        "capacity_after": cap_after,
-        "capacity_delta": cap_after - cap_before,
-        "male_before": male_before,
-        "male_after": male_after,
-        "male_delta": male_after - male_before,
-        "queer_before": queer_before,
-        "queer_after": queer_after,
-        "queer_delta": queer_after - queer_before,
-        "normie_before": normie_before,
-        "normie_after": normie_after,
-        "normie_delta": normie_after - normie_before,
-        "churn": churn,
-        "fill": fill,
-        "turbulence": turbulence,
-    }
-
-    return new_club, sim_diag
+    if diagnostics is None:
+        diagnostics = {}
+    diagnostics["capacity_before"] = cap_before
+    diagnostics["capacity_after"] = cap_after
+    diagnostics["capacity_delta"] = cap_after - cap_before
+    diagnostics["male_before"] = male_before
+    diagnostics["male_after"] = male_after
+    diagnostics["male_delta"] = male_after - male_before
+    diagnostics["queer_before"] = queer_before
+    diagnostics["queer_after"] = queer_after
+    diagnostics["queer_delta"] = queer_after - queer_before
+    diagnostics["normie_before"] = normie_before
+    diagnostics["normie_after"] = normie_after
+    diagnostics["normie_delta"] = normie_after - normie_before
+    diagnostics["churn"] = churn
+    diagnostics["fill"] = fill
+    diagnostics["turbulence"] = turbulence
+
+    return new_club, diagnostics
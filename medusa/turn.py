@@ -0,0 +1,53 @@
+# medusa/turn.py
+from __future__ import annotations
+
+import random
+from array import array
+from typing import Dict, Tuple
+
+from medusa.config import VIBE_MIN, VIBE_MAX
+from medusa.mathutil import clamp
+from medusa.models import ClubState, GameState, SongCard, pack_diagnostics
+from medusa.scoring import score_choice
+from medusa.simulation import update_club
+
+
+def resolve_turn(
+    rng: random.Random,
+    state: GameState,
+    chosen: SongCard,
+) -> Tuple[int, float, float, str, ClubState, array]:
+    """
+    Score `chosen` and advance the club sim in one pass.
+    Both stages write into a single diagnostics dict, packed once at the end.
+
+    Returns (points, vibe_delta, vibe_after, reaction, new_club, diagnostics_vec).
+    Does not mutate `state`; the caller applies the results.
+    """
+    diag: Dict[str, float] = {}
+
+    points, vibe_delta, reaction, did_trainwreck, _ = score_choice(
+        rng=rng,
+        turn_index=state.turn,
+        score_total=state.score,
+        vibe=state.vibe,
+        club=state.club,
+        active_song=state.active_song,
+        chosen=chosen,
+        history_genre_idx=state.hist_genre_idx,
+        history_bpm=state.hist_bpm,
+        diagnostics=diag,
+    )
+
+    vibe_after = clamp(state.vibe + vibe_delta, VIBE_MIN, VIBE_MAX)
+
+    new_club, _ = update_club(
+        rng=rng,
+        club=state.club,
+        vibe_before=state.vibe,
+        vibe_after=vibe_after,
+        did_trainwreck=did_trainwreck,
+        diagnostics=diag,
+    )
+
+    return points, vibe_delta, vibe_after, reaction, new_club, pack_diagnostics(diag)
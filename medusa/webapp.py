@@ -1,34 +1,69 @@
 # medusa/webapp.py
 from __future__ import annotations
 
+import functools
+import os
 import uuid
 import random
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Optional, Tuple
 
 from fastapi import FastAPI, Request, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 
-from medusa.config import TOTAL_TURNS, VIBE_MIN, VIBE_MAX, VIBE_START, CAPACITY_START, MALE_START, QUEER_START, NORMIE_START
-from medusa.models import GameState, ClubState, SongCard, TurnResult
-from medusa.generation import gen_base_song, deal_hand
-from medusa.scoring import score_choice
-from medusa.simulation import update_club
+from medusa.config import TOTAL_TURNS, VIBE_START, CAPACITY_START, MALE_START, QUEER_START, NORMIE_START
+from medusa.models import GameState, ClubState, TurnResult
+from medusa.session_store import make_session_store
+
+if TYPE_CHECKING:
+    from fastapi.templating import Jinja2Templates
+    from jinja2 import Template
+
+# Heavier imports (Jinja, generation/scoring/simulation) are deferred to first
+# use so the server process starts faster.
 
 app = FastAPI()
-templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# In-memory sessions (POC). Later: Redis/db or signed cookies.
-SESSIONS: Dict[str, GameState] = {}
+_JINJA_CACHE_DIR = ".jinja_cache"
+
+
+@functools.lru_cache(maxsize=1)
+def _get_templates() -> Jinja2Templates:
+    # Templates don't change while the server runs: skip mtime checks and keep
+    # compiled bytecode on disk so restarts don't re-parse them.
+    from fastapi.templating import Jinja2Templates
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    os.makedirs(_JINJA_CACHE_DIR, exist_ok=True)
+    env = Environment(
+        loader=FileSystemLoader("templates"),
+        autoescape=True,
+        bytecode_cache=FileSystemBytecodeCache(_JINJA_CACHE_DIR),
+        auto_reload=False,
+        keep_trailing_newline=True,
+    )
+    return Jinja2Templates(env=env)
+
 
+@functools.lru_cache(maxsize=1)
+def _get_game_page() -> Tuple[str, Template, str]:
+    # Static chrome around the game page is rendered once; only the body is
+    # rendered per request.
+    env = _get_templates().env
+    head = env.get_template("_chrome_head.html").render()
+    foot = env.get_template("_chrome_foot.html").render()
+    return head, env.get_template("_game_body.html"), foot
 
-def clamp(x: float, lo: float, hi: float) -> float:
-    return lo if x < lo else hi if x > hi else x
+
+# In-memory LRU by default; set MEDUSA_SESSION_DIR to share sessions across
+# worker processes through files. Later: Redis/db or signed cookies.
+SESSIONS = make_session_store()
 
 
 def new_game(seed: Optional[int] = None) -> GameState:
+    from medusa.generation import gen_base_song, deal_hand
+
     rng = random.Random(seed)
     active = gen_base_song(rng)
     club = ClubState(
@@ -44,16 +79,12 @@ def new_game(seed: Optional[int] = None) -> GameState:
         vibe=VIBE_START,
         club=club,
         active_song=active,
+        rng=rng,
     )
     state.hand = deal_hand(rng, state.active_song)
     return state
 
 
-def get_rng(state: GameState) -> random.Random:
-    # Deterministic per session if seed provided; otherwise stable randomness per run.
-    return random.Random(state.rng_seed) if state.rng_seed is not None else random.Random()
-
-
 @app.get("/", response_class=HTMLResponse)
 def root(request: Request):
     # create a session and redirect to it
@@ -69,10 +100,10 @@ def game_view(request: Request, sid: str):
         return RedirectResponse(url="/", status_code=303)
 
     if state.turn >= TOTAL_TURNS:
-        return templates.TemplateResponse(
+        return _get_templates().TemplateResponse(
+            request,
             "end.html",
             {
-                "request": request,
                 "sid": sid,
                 "score": state.score,
                 "turns": TOTAL_TURNS,
@@ -84,10 +115,9 @@ def game_view(request: Request, sid: str):
     last_turn = state.history[-1] if state.history else None
     previous_song = last_turn.prev_active if last_turn else None
 
-    return templates.TemplateResponse(
-        "game.html",
+    head, body_template, foot = _get_game_page()
+    body = body_template.render(
         {
-            "request": request,
             "sid": sid,
             "turn": state.turn,
             "turns": TOTAL_TURNS,
@@ -101,10 +131,18 @@ def game_view(request: Request, sid: str):
             "previous": previous_song,
         },
     )
+    return HTMLResponse(head + body + foot)
 
 
 @app.post("/game/{sid}/play")
 def play_card(sid: str, choice: int = Form(...)):
+    # Hold the session lock across load -> play -> save so concurrent plays
+    # of one sid (threadpool threads or other workers) can't drop a turn.
+    with SESSIONS.lock(sid):
+        return _play_turn(sid, choice)
+
+
+def _play_turn(sid: str, choice: int):
     state = SESSIONS.get(sid)
     if not state:
         return RedirectResponse(url="/", status_code=303)
@@ -112,42 +150,24 @@ def play_card(sid: str, choice: int = Form(...)):
     if state.turn >= TOTAL_TURNS:
         return RedirectResponse(url=f"/game/{sid}", status_code=303)
 
+    from medusa.generation import deal_hand
+    from medusa.genre import genre_index
+    from medusa.turn import resolve_turn
+
     # Validate choice (1..8)
     idx = int(choice) - 1
     if idx < 0 or idx >= len(state.hand):
         return RedirectResponse(url=f"/game/{sid}", status_code=303)
 
-    # Use a per-session RNG stream:
-    # POC: derive from (seed, turn) so it’s stable-ish.
-    # If no seed, still okay.
-    seed = state.rng_seed if state.rng_seed is not None else random.randrange(
-        1_000_000_000)
-    rng = random.Random(seed + state.turn * 10007)
+    # Per-session RNG stream (deterministic if the game was seeded).
+    rng = state.rng
 
     chosen = state.hand[idx]
     vibe_before = state.vibe
     cap_before = state.club.capacity
 
-    points, vibe_delta, reaction, diag = score_choice(
-        rng=rng,
-        turn_index=state.turn,
-        score_total=state.score,
-        vibe=state.vibe,
-        club=state.club,
-        active_song=state.active_song,
-        chosen=chosen,
-        history=state.history,
-    )
-
-    vibe_after = clamp(state.vibe + vibe_delta, VIBE_MIN, VIBE_MAX)
-
-    new_club, sim_diag = update_club(
-        rng=rng,
-        club=state.club,
-        vibe_before=vibe_before,
-        vibe_after=vibe_after,
-        diagnostics=diag,
-    )
+    points, vibe_delta, vibe_after, reaction, new_club, diag_vec = resolve_turn(
+        rng, state, chosen)
 
     # Record history
     tr = TurnResult(
@@ -161,11 +181,13 @@ def play_card(sid: str, choice: int = Form(...)):
         vibe_after=vibe_after,
         capacity_before=cap_before,
         capacity_after=new_club.capacity,
-        diagnostics={**diag, **sim_diag},
+        diagnostics_vec=diag_vec,
         reaction=reaction,
     )
 
     state.history.append(tr)
+    state.hist_genre_idx.append(genre_index(chosen.genre))
+    state.hist_bpm.append(chosen.bpm)
     sign = "+" if points >= 0 else ""
     vsign = "+" if vibe_delta >= 0 else ""
     state.last_reaction = f"{sign}{points} pts • {vsign}{vibe_delta:.0f} vibe — {reaction}"
@@ -180,4 +202,7 @@ def play_card(sid: str, choice: int = Form(...)):
     # Deal next hand
     state.hand = deal_hand(rng, state.active_song)
 
+    # Write back so file-backed stores see the new turn.
+    SESSIONS[sid] = state
+
     return RedirectResponse(url=f"/game/{sid}", status_code=303)
@@ -0,0 +1,174 @@
+import json
+import os
+import random
+import time
+import uuid
+
+import pytest
+
+from medusa.config import CAPACITY_START, MALE_START, NORMIE_START, QUEER_START
+from medusa.generation import deal_hand, gen_base_song
+from medusa.genre import genre_index
+from medusa.models import ClubState, GameState, TurnResult
+from medusa.session_store import (
+    FileSessions,
+    LRUSessions,
+    state_from_dict,
+    state_to_dict,
+)
+from medusa.turn import resolve_turn
+
+
+def _played_state(turns: int = 5, seed: int = 7) -> GameState:
+    rng = random.Random(seed)
+    state = GameState(
+        rng_seed=seed,
+        turn=0,
+        score=0,
+        vibe=0.0,
+        club=ClubState(CAPACITY_START, MALE_START, QUEER_START, NORMIE_START),
+        active_song=gen_base_song(rng),
+        rng=rng,
+    )
+    state.hand = deal_hand(rng, state.active_song)
+    for t in range(turns):
+        chosen = state.hand[t % len(state.hand)]
+        points, vibe_delta, vibe_after, reaction, club, diag_vec = resolve_turn(
+            rng, state, chosen)
+        state.history.append(TurnResult(
+            turn_index=t,
+            chosen_index=t % len(state.hand),
+            chosen_card=chosen,
+            prev_active=state.active_song,
+            points_gained=points,
+            score_total=state.score + points,
+            vibe_before=state.vibe,
+            vibe_after=vibe_after,
+            capacity_before=state.club.capacity,
+            capacity_after=club.capacity,
+            diagnostics_vec=diag_vec,
+            reaction=reaction,
+        ))
+        state.hist_genre_idx.append(genre_index(chosen.genre))
+        state.hist_bpm.append(chosen.bpm)
+        state.score += points
+        state.vibe = vibe_after
+        state.club = club
+        state.active_song = chosen
+        state.turn += 1
+        state.hand = deal_hand(rng, state.active_song)
+    return state
+
+
+def test_state_round_trips_through_json():
+    state = _played_state()
+    restored = state_from_dict(json.loads(json.dumps(state_to_dict(state))))
+
+    assert restored == state
+    assert restored.rng.getstate() == state.rng.getstate()
+    assert restored.hist_genre_idx.typecode == "h"
+    assert restored.hist_bpm.typecode == "h"
+    for before, after in zip(state.history, restored.history):
+        assert after.diagnostics_vec.typecode == "f"
+        assert after.diagnostics_vec == before.diagnostics_vec
+        assert after.diagnostics == before.diagnostics
+    # Same stream from here on.
+    assert restored.rng.random() == state.rng.random()
+
+
+def test_file_sessions_round_trip(tmp_path):
+    store = FileSessions(str(tmp_path))
+    sid = str(uuid.uuid4())
+    state = _played_state(turns=2)
+
+    store[sid] = state
+
+    assert store[sid] == state
+    assert len(store) == 1
+
+
+@pytest.mark.parametrize("sid", ["../etc/passwd", "not-a-uuid", ""])
+def test_file_sessions_reject_non_uuid_sids(tmp_path, sid):
+    store = FileSessions(str(tmp_path))
+
+    assert store.get(sid) is None
+    with pytest.raises(KeyError):
+        store[sid] = _played_state(turns=0)
+    with store.lock(sid):
+        pass
+    assert os.listdir(tmp_path) == []
+
+
+def test_file_sessions_expire_by_mtime(tmp_path):
+    store = FileSessions(str(tmp_path), ttl_seconds=60)
+    sid = str(uuid.uuid4())
+    store[sid] = _played_state(turns=0)
+    path = tmp_path / f"{sid}.json"
+    stale = time.time() - 120
+    os.utime(path, (stale, stale))
+
+    assert store.get(sid) is None
+    assert not path.exists()
+
+
+def test_file_sessions_sweep_removes_expired_files(tmp_path):
+    store = FileSessions(str(tmp_path), ttl_seconds=60)
+    old_sid, new_sid = str(uuid.uuid4()), str(uuid.uuid4())
+    store[old_sid] = _played_state(turns=0)
+    with store.lock(old_sid):
+        pass
+    stale = time.time() - 120
+    for name in (f"{old_sid}.json", f"{old_sid}.lock"):
+        os.utime(tmp_path / name, (stale, stale))
+
+    store._last_sweep = 0.0  # force the next write to sweep
+    store[new_sid] = _played_state(turns=0)
+
+    assert sorted(os.listdir(tmp_path)) == [f"{new_sid}.json"]
+
+
+def test_lru_sessions_evict_least_recently_used():
+    store = LRUSessions(max_size=2, ttl_seconds=60)
+    a, b, c = (_played_state(turns=0, seed=s) for s in range(3))
+    store["a"] = a
+    store["b"] = b
+    store.get("a")
+    store["c"] = c
+
+    assert store.get("a") is a
+    assert store.get("b") is None
+    assert store.get("c") is c
+
+
+def test_lru_sessions_expire_idle_entries():
+    store = LRUSessions(max_size=10, ttl_seconds=0.0)
+    store["a"] = _played_state(turns=0)
+    time.sleep(0.001)
+
+    assert store.get("a") is None
+    assert len(store) == 0
+
+
+def test_file_sessions_sweep_removes_orphaned_lock_files(tmp_path):
+    store = FileSessions(str(tmp_path), ttl_seconds=3600)
+    orphan = tmp_path / f"{uuid.uuid4()}.lock"
+    orphan.touch()
+    stale = time.time() - 3600
+    os.utime(orphan, (stale, stale))
+    live_sid = str(uuid.uuid4())
+
+    store._last_sweep = 0.0  # force the next write to sweep
+    store[live_sid] = _played_state(turns=0)
+    with store.lock(live_sid):
+        pass
+
+    assert sorted(os.listdir(tmp_path)) == [
+        f"{live_sid}.json", f"{live_sid}.lock"]
+
+
+def test_file_sessions_treat_unreadable_format_as_missing(tmp_path):
+    store = FileSessions(str(tmp_path))
+    sid = str(uuid.uuid4())
+    (tmp_path / f"{sid}.json").write_text(json.dumps({"turn": 3}))
+
+    assert store.get(sid) is None